@@ -23,16 +23,21 @@ class LogViewType(Enum):
 
 
 class ExperimentConfig(ABC):
+    # Fixed attributes live in slots; __dict__ is kept for subclass attributes and cached properties
+    __slots__ = ('_name', '_pretty_name', '_description', '_base_config', '_logview', '_user_options',
+                 'diagnostic_options', '__dict__')
+
     _name: str
     _description: str
-    _base_config: str
+    _base_config: list[str]
     _logview: Optional[LogViewType]
 
-    def __init__(self, name: str, description: Optional[str], base_config: str, pretty_name: Optional[str] = None):
+    def __init__(self, name: str, description: Optional[str], base_config: str | list[str], pretty_name: Optional[str] = None):
         self._name = name
         self._pretty_name = pretty_name if pretty_name is not None else name
         self._description = description or ''
-        self._base_config = base_config
+        # Kept as fragments so large shared option files are not copied into every experiment
+        self._base_config = [base_config] if isinstance(base_config, str) else list(base_config)
         self._logview = None
         self._user_options = dict()
         self.diagnostic_options = dict()
@@ -51,7 +56,7 @@ class ExperimentConfig(ABC):
 
     @property
     def base_config(self) -> str:
-        return self._base_config
+        return ''.join(self._base_config)
 
     @property
     @abstractmethod
@@ -109,25 +114,34 @@ class ExperimentConfig(ABC):
             raise TypeError("user_options must be a list or a dict")
 
     @property
-    def config(self) -> str:
-        config = self.base_config + self.mesh_options + self.diagnostic_config + self.user_config
+    def config_parts(self) -> list[str]:
+        """Fragments of the configuration file, in order"""
+        parts = [*self._base_config, self.mesh_options, self.diagnostic_config, self.user_config]
         match self.logview:
             case LogViewType.FLAMEGRAPH | LogViewType.XML | LogViewType.DETAIL:
-                config += '\n' + '\n'.join([
+                parts.append('\n' + '\n'.join([
                     f'log_view: :log_view{self.logview.to_petsc()}',
                     'log_view_gpu_time:',
-                ])
+                ]))
             case LogViewType.TEXT:
-                config += '\n' + '\n'.join([
+                parts.append('\n' + '\n'.join([
                     f'log_view: :log_view{self.logview.to_petsc()}',
                     'log_view_gpu_time:',
-                ])
-        return config
+                ]))
+        return parts
+
+    @property
+    def config(self) -> str:
+        return ''.join(self.config_parts)
+
+    def prime_caches(self) -> None:
+        """Compute cached options now, so that shallow copies of this experiment share them instead of recomputing"""
+        self.mesh_options
 
     def write_config(self, output_dir: Path) -> Path:
         """Write the configuration file for the experiment to output_dir."""
         config_path = output_dir / f'{self.name}.yaml'
         with config_path.open('w') as f:
-            f.write(self.config)
+            f.writelines(self.config_parts)
 
         return config_path
@@ -1,11 +1,14 @@
 # This module is responsible for generating flux scripts to run experiments.
 from pathlib import Path
-from math import ceil, prod
+from math import ceil
 import tempfile
+import copy
+import os
 from rich import print, get_console
 import subprocess
 import shutil
 from itertools import product
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import re
 
@@ -282,93 +285,17 @@ def sweep(
     dry_run: bool = False,
 ):
     """Generate flux scripts for a parameter sweep."""
-    options = experiment.user_options.copy()
-    num_runs = prod(map(len, parameters.values()))
-    ratel_dir = Path(config.get_fallback('RATEL_DIR'))
-    scratch_dir = Path(config.get_fallback('SCRATCH_DIR'))
-    output_dir = Path(config.get_fallback('OUTPUT_DIR', Path.cwd() / 'output'))
-
-    if machine is None:
-        machine = detect_machine()
-        if machine is None:
-            raise ValueError("Could not detect machine. Please specify a machine.")
-
-    if not output_dir.exists():
-        output_dir.mkdir(parents=True)
-
-    sweep_name = experiment.name + f'-{sweep_name}-' + '-'.join(parameters.keys())
-    sweep_output_dir = (output_dir / sweep_name).resolve()
-    sweep_script_dir = (sweep_output_dir / 'flux_scripts').resolve()
-    sweep_options_dir = (sweep_output_dir / 'options').resolve()
-
-    print(f'{experiment}')
-    print("")
-    print(f'[h2]Parameter Sweep[/]')
-    print(f"  • Sweeping {len(parameters)} parameters:")
-    for name, values in parameters.items():
-        print(f"    • {name}: {', '.join(map(str, values))}")
-    print(f"  • Total number of runs: {num_runs}")
-    print(f"  • Number of processes per run: {num_processes}")
-    print(f"  • Number of nodes per run: {int(ceil(num_processes / get_machine_config(machine).gpus_per_node))}")
-    print(f"  • Output directory: {sweep_output_dir}")
-    print(f"  • Script directory: {sweep_script_dir}")
-
-    if sweep_output_dir.exists() and not yes:
-        yn = console.input(f"[warning]Directory {sweep_output_dir} already exists. Remove?[/] (y/n) ")
-        if yn.lower() != 'y':
-            raise FileExistsError(f"Directory {sweep_output_dir} already exists.")
-    if sweep_output_dir.exists():
-        shutil.rmtree(sweep_output_dir)
-    sweep_output_dir.mkdir(parents=True, exist_ok=True)
-    sweep_script_dir.mkdir()
-    sweep_options_dir.mkdir()
-
-    scripts = []
-    for params in product(*parameters.values()):
-        param_dict = dict(zip(parameters.keys(), params))
-        param_dict_str = dict(zip(parameters.keys(), map(str, params)))
-        new_options = options.copy()
-        new_options.update(param_dict_str)
-        experiment.user_options = new_options
-
-        print(f"[info]Generating script for parameters:")
-        for name, val in param_dict.items():
-            print(f"[info]    • {name}: {val}")
-
-        link_name = '---'.join([f"{key}-{value}" for key, value in param_dict_str.items()])
-
-        # Capture output to avoid cluttering console
-        console.begin_capture()
-        script_path, options_path = generate(
-            experiment,
-            machine=machine,
-            num_processes=num_processes,
-            max_time=max_time,
-            output_dir=sweep_output_dir,
-            link_name=link_name,
-        )
-        console.end_capture()
-        shutil.copy(script_path, sweep_script_dir / script_path.name)
-        script_path.unlink()
-        script_path = sweep_script_dir / script_path.name
-
-        # Link options file for ease of access
-        (sweep_options_dir / options_path.name).symlink_to(options_path)
-
-        scripts.append(script_path)
-        print(f"[info]  Script written to: {script_path}[/]")
-        print(f"[info]  Output directory:  {sweep_output_dir / link_name}[/]")
-
-    print(f"[info]All scripts written to: {sweep_script_dir}[/]")
-    print("")
-    if dry_run:
-        print(f"[info]Dry run mode: not submitting jobs.[/]")
-        return
-    print(f"[h2]Submitting jobs...[/]")
-    for script_path in scripts:
-        run(script_path)
-
-    print(f"[success]All jobs submitted![/]")
+    _parameter_study(
+        experiment,
+        machine,
+        num_processes,
+        max_time,
+        parameters,
+        list(product(*parameters.values())),
+        sweep_name,
+        yes,
+        dry_run,
+    )
 
 
 def uq(
@@ -382,9 +309,33 @@ def uq(
     dry_run: bool = False,
 ):
     """Generate flux scripts for a UQ study."""
+    _parameter_study(
+        experiment,
+        machine,
+        num_processes,
+        max_time,
+        parameters,
+        list(zip(*parameters.values())),
+        sweep_name,
+        yes,
+        dry_run,
+    )
+
+
+def _parameter_study(
+    experiment: ExperimentConfig,
+    machine: Optional[Machine],
+    num_processes: int,
+    max_time: Optional[str],
+    parameters: dict,
+    parameter_sets: list[tuple],
+    sweep_name: str,
+    yes: bool,
+    dry_run: bool,
+):
+    """Generate and submit flux scripts for each set of parameter values, shared by `sweep` and `uq`."""
     options = experiment.user_options.copy()
-    num_runs = len(list(parameters.values())[0])
-    scratch_dir = Path(config.get_fallback('SCRATCH_DIR'))
+    num_runs = len(parameter_sets)
     output_dir = Path(config.get_fallback('OUTPUT_DIR', Path.cwd() / 'output'))
     if machine is None:
         machine = detect_machine()
@@ -420,42 +371,53 @@ def uq(
     sweep_output_dir.mkdir(parents=True, exist_ok=True)
     sweep_script_dir.mkdir()
     sweep_options_dir.mkdir()
+    # Workers share this directory, so create it before they start
+    (sweep_output_dir / 'flux_output').mkdir()
 
-    scripts = []
-    for params in zip(*parameters.values()):
+    # Generate the mesh once, before any copies are made
+    experiment.prime_caches()
+
+    def generate_script(params: tuple) -> tuple[dict, str, Path]:
         param_dict = dict(zip(parameters.keys(), params))
         param_dict_str = dict(zip(parameters.keys(), map(str, params)))
         new_options = options.copy()
         new_options.update(param_dict_str)
-        experiment.user_options = new_options
-
-        print(f"[info]Generating script for parameters:")
-        for name, val in param_dict.items():
-            print(f"[info]    • {name}: {val}")
+        job = copy.copy(experiment)
+        job.user_options = new_options
 
         link_name = '---'.join([f"{key}-{value}" for key, value in param_dict_str.items()])
 
-        # Capture output to avoid cluttering console
+        # Capture output to avoid cluttering console, captures are per-thread
         console.begin_capture()
-        script_path, options_path = generate(
-            experiment,
-            machine=machine,
-            num_processes=num_processes,
-            max_time=max_time,
-            output_dir=sweep_output_dir,
-            link_name=link_name,
-        )
-        console.end_capture()
+        try:
+            script_path, options_path = generate(
+                job,
+                machine=machine,
+                num_processes=num_processes,
+                max_time=max_time,
+                output_dir=sweep_output_dir,
+                link_name=link_name,
+            )
+        finally:
+            console.end_capture()
         shutil.copy(script_path, sweep_script_dir / script_path.name)
         script_path.unlink()
         script_path = sweep_script_dir / script_path.name
 
         # Link options file for ease of access
         (sweep_options_dir / options_path.name).symlink_to(options_path)
+        return param_dict, link_name, script_path
 
-        scripts.append(script_path)
-        print(f"[info]  Script written to: {script_path}[/]")
-        print(f"[info]  Output directory:  {sweep_output_dir / link_name}[/]")
+    # Script generation is dominated by file I/O, so threads overlap well
+    scripts = []
+    with ThreadPoolExecutor(max_workers=max(1, min(num_runs, os.cpu_count() or 1))) as executor:
+        for param_dict, link_name, script_path in executor.map(generate_script, parameter_sets):
+            print(f"[info]Generating script for parameters:")
+            for name, val in param_dict.items():
+                print(f"[info]    • {name}: {val}")
+            scripts.append(script_path)
+            print(f"[info]  Script written to: {script_path}[/]")
+            print(f"[info]  Output directory:  {sweep_output_dir / link_name}[/]")
 
     print(f"[info]All scripts written to: {sweep_script_dir}[/]")
     print("")
@@ -12,6 +12,12 @@ def run_once(func: Callable) -> Callable:
     return wrapper
 
 
+def yaml_full_loader():
+    """PyYAML's FullLoader, preferring the libyaml bindings when available"""
+    import yaml
+    return getattr(yaml, 'CFullLoader', yaml.FullLoader)
+
+
 def callback_is_set(value):
     if value is None:
         raise typer.BadParameter("Required CLI option")
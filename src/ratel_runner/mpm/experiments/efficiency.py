@@ -1,11 +1,14 @@
 from pathlib import Path
 import typer
-from typing import Annotated, Optional
+from typing import Annotated, Final, Optional
 
 from ...helper.flux import machines, flux
 from ...helper.experiment import ExperimentConfig, LogViewType
 
 
+_BASE_NAME: Final[str] = Path(__file__).stem.replace('_', '-')
+
+
 _base_side_length = 0.1
 _efficiency_base_config = f"""# Single material, simple test to determine optimal point/GPU
 method: mpm
@@ -71,7 +74,7 @@ class EfficiencyForcingExperiment(ExperimentConfig):
         self.num_cells_1d = num_cells_1d
         self.num_points_per_cell = points_per_cell
         self.order = order
-        super().__init__(Path(__file__).stem.replace('_', '-'), self.__doc__, _efficiency_base_config)
+        super().__init__(_BASE_NAME, self.__doc__, _efficiency_base_config)
 
     @property
     def mesh_options(self) -> str:
@@ -96,7 +99,7 @@ class EfficiencyForcingExperiment(ExperimentConfig):
         return f"{self._name}_{self.num_cells_1d}"
 
     def __str__(self) -> str:
-        output = '\n'.join([
+        lines = [
             f'[h1]Ratel iMPM Efficiency Experiment[/]',
             f'{self.description}',
             f"\n[h2]Mesh Options[/]",
@@ -104,20 +107,22 @@ class EfficiencyForcingExperiment(ExperimentConfig):
             f"  • Number of cells: {self.num_cells_1d}^3={self.num_cells_1d**3}",
             f"  • Points per cell: {self.num_points_per_cell}",
             f"  • Points per GPU: {self.num_points_per_cell * self.num_cells_1d**3}",
-        ])
+        ]
         if self.user_options:
-            output += "\n[h2]User Options[/]\n"
-            output += "\n".join([f"  • {key}: {value}" for key, value in self.user_options.items()])
-        return output
+            lines.append("[h2]User Options[/]")
+            lines.extend(f"  • {key}: {value}" for key, value in self.user_options.items())
+        return '\n'.join(lines)
 
 
 __doc__ = EfficiencyForcingExperiment.__doc__
 
 app = typer.Typer(name="efficiency", help=__doc__)
 
+NumCells1DArg = Annotated[int, typer.Argument(min=3)]
+
 
 @app.command()
-def write_config(num_cells_1d: Annotated[int, typer.Argument(min=3)],
+def write_config(num_cells_1d: NumCells1DArg,
                  output_dir: Path, log_view: Optional[LogViewType] = None):
     """Generate the efficiency experiment configuration."""
     experiment = EfficiencyForcingExperiment(num_cells_1d)
@@ -130,7 +135,7 @@ def write_config(num_cells_1d: Annotated[int, typer.Argument(min=3)],
 )
 def flux_run(
     ctx: typer.Context,
-    num_cells_1d: Annotated[int, typer.Argument(min=3)],
+    num_cells_1d: NumCells1DArg,
     order: Annotated[int, typer.Argument(min=1)] = 1,
     points_per_cell: Annotated[int, typer.Argument(min=8)] = 27,
     num_processes: Annotated[int, typer.Option("-n", min=1)] = 1,
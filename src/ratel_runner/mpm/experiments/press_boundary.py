@@ -1,6 +1,7 @@
 from enum import Enum
 from dataclasses import dataclass
 from abc import abstractmethod, ABC
+import functools
 
 
 class BoundaryType(Enum):
@@ -41,6 +42,11 @@ class PressBoundary(ABC):
     def name(self) -> str:
         pass
 
+    @property
+    def parameters(self) -> tuple:
+        """Values which determine the generated options"""
+        return (self.bc_type,)
+
 
 class PressBoundaryContact(PressBoundary):
     friction_coefficient: float
@@ -49,29 +55,27 @@ class PressBoundaryContact(PressBoundary):
         super().__init__(bc_type=BoundaryType.CONTACT, **kwargs)
         self.friction_coefficient = friction_coefficient
 
-    @property
+    @functools.cached_property
     def snes_options(self) -> str:
-        if not hasattr(self, '_snes_options'):
-            self._snes_options = '\n'.join([
-                "# SNES options for contact boundary conditions",
-                "snes:",
-                "  monitor:",
-                "  max_it: 15",
-                "  rtol: 1e-6",
-                "augmented_lagrangian_inner_snes:",
-                "  linesearch:",
-                "    type: bt",
-                "    monitor:",
-                "  max_it: 20",
-                "  monitor:",
-                "  ksp:",
-                "    ew:",
-                "    ew_version: 3",
-                "    ew_rtol0: 1e-4",
-                "    ew_rtolmax: 1e-4",
-                ""
-            ])
-        return self._snes_options
+        return '\n'.join([
+            "# SNES options for contact boundary conditions",
+            "snes:",
+            "  monitor:",
+            "  max_it: 15",
+            "  rtol: 1e-6",
+            "augmented_lagrangian_inner_snes:",
+            "  linesearch:",
+            "    type: bt",
+            "    monitor:",
+            "  max_it: 20",
+            "  monitor:",
+            "  ksp:",
+            "    ew:",
+            "    ew_version: 3",
+            "    ew_rtol0: 1e-4",
+            "    ew_rtolmax: 1e-4",
+            ""
+        ])
 
     def options(self, center, radius, height, load_fraction) -> str:
         if self.friction_coefficient == 0.0:
@@ -132,6 +136,10 @@ class PressBoundaryContact(PressBoundary):
             ])
         return ops
 
+    @property
+    def parameters(self) -> tuple:
+        return (self.bc_type, self.friction_coefficient)
+
     @property
     def name(self) -> str:
         friction_str = f"mu{self.friction_coefficient}" if self.friction_coefficient != 0.0 else "frictionless"
@@ -146,25 +154,23 @@ class PressBoundaryClamped(PressBoundary):
     def __init__(self, **kwargs):
         super().__init__(bc_type=BoundaryType.CLAMPED, **kwargs)
 
-    @property
+    @functools.cached_property
     def snes_options(self) -> str:
-        if not hasattr(self, '_snes_options'):
-            self._snes_options = '\n'.join([
-                "# SNES options for slip/clamped boundary conditions",
-                "snes:",
-                "  linesearch:",
-                "    type: bisection",
-                "    monitor:",
-                "  max_it: 20",
-                "  monitor:",
-                "  ksp:",
-                "    ew:",
-                "    ew_version: 3",
-                "    ew_rtol0: 1e-4",
-                "    ew_rtolmax: 1e-4",
-                "",
-            ])
-        return self._snes_options
+        return '\n'.join([
+            "# SNES options for slip/clamped boundary conditions",
+            "snes:",
+            "  linesearch:",
+            "    type: bisection",
+            "    monitor:",
+            "  max_it: 20",
+            "  monitor:",
+            "  ksp:",
+            "    ew:",
+            "    ew_version: 3",
+            "    ew_rtol0: 1e-4",
+            "    ew_rtolmax: 1e-4",
+            "",
+        ])
 
     def options(self, center, radius, height, load_fraction) -> str:
         return '\n'.join([
@@ -198,25 +204,23 @@ class PressBoundarySlipFreeEnds(PressBoundary):
     def __init__(self, **kwargs):
         super().__init__(bc_type=BoundaryType.SLIP_FREE_ENDS, **kwargs)
 
-    @property
+    @functools.cached_property
     def snes_options(self) -> str:
-        if not hasattr(self, '_snes_options'):
-            self._snes_options = '\n'.join([
-                "# SNES options for slip/clamped boundary conditions",
-                "snes:",
-                "  linesearch:",
-                "    type: bisection",
-                "    monitor:",
-                "  max_it: 20",
-                "  monitor:",
-                "  ksp:",
-                "    ew:",
-                "    ew_version: 3",
-                "    ew_rtol0: 1e-4",
-                "    ew_rtolmax: 1e-4",
-                "",
-            ])
-        return self._snes_options
+        return '\n'.join([
+            "# SNES options for slip/clamped boundary conditions",
+            "snes:",
+            "  linesearch:",
+            "    type: bisection",
+            "    monitor:",
+            "  max_it: 20",
+            "  monitor:",
+            "  ksp:",
+            "    ew:",
+            "    ew_version: 3",
+            "    ew_rtol0: 1e-4",
+            "    ew_rtolmax: 1e-4",
+            "",
+        ])
 
     def options(self, center, radius, height, load_fraction) -> str:
         return '\n'.join([
@@ -245,3 +249,18 @@ class PressBoundarySlipFreeEnds(PressBoundary):
 
     def __str__(self) -> str:
         return "Clamped Wall Boundary with Free-Slip Boundaries on Top and Bottom"
+
+
+_options_cache: dict[tuple, str] = {}
+
+
+def cached_options(boundary: PressBoundary, center, radius: float, height: float, load_fraction: float) -> str:
+    """Memoized `PressBoundary.options`, shared between boundaries of the same type and parameters.
+
+    The key is read from `boundary.parameters` on every call, so a boundary modified after first use is not served
+    stale options.
+    """
+    key = (type(boundary), boundary.parameters, tuple(center), radius, height, load_fraction)
+    if key not in _options_cache:
+        _options_cache[key] = boundary.options(center, radius, height, load_fraction)
+    return _options_cache[key]
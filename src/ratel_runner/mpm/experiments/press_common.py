@@ -1,14 +1,18 @@
 from pathlib import Path
 import rich
-from rich.syntax import Syntax
-from multiprocessing import cpu_count
 from enum import Enum
 import typer
 from typing import Annotated, Optional, ClassVar
 from abc import ABC, abstractmethod
 from types import SimpleNamespace
 import math
+import secrets
+import csv
+import os
+import functools
+import copy
 from importlib.util import find_spec
+import importlib.resources
 
 from ...helper.experiment import ExperimentConfig, LogViewType
 from ...helper import config
@@ -18,13 +22,13 @@ from ...helper.utilities import run_once, callback_is_set, LazyImporter
 from .. import local
 from ..sweep import load_sweep_specification
 
-from .press_boundary import BoundaryType, PressBoundary
+from .press_boundary import BoundaryType, PressBoundary, cached_options
 
 
 @run_once
 def check_imports():
     missing = []
-    for module in ['gmsh', 'numpy', 'pandas']:
+    for module in ['gmsh', 'numpy']:
         if find_spec(module) is None:
             missing.append(module)
     if missing:
@@ -38,7 +42,6 @@ check_imports()
 
 gmsh = LazyImporter('gmsh')
 np = LazyImporter('numpy')
-pd = LazyImporter('pandas')
 
 
 console = rich.get_console()
@@ -68,16 +71,73 @@ def register_keys():
 register_keys()
 
 
-def compute_die_stats(voxel_data, voxel_size: float, buf: int):
-    with open(voxel_data) as f:
-        line = f.readline()
-    _, nx, ny, nz = map(int, line.split())
+_YML_DIR = importlib.resources.files(__package__ or '') / 'yml'
+
+
+@functools.lru_cache(maxsize=None)
+def load_yaml_resource(name: str) -> str:
+    """Read an options file from the experiments `yml` directory, shared by all experiment instances"""
+    return (_YML_DIR / name).read_text()
+
+
+@functools.lru_cache(maxsize=32)
+def _die_stats(voxel_data: str, mtime_ns: int, voxel_size: float, buf: int):
+    with open(voxel_data, 'rb') as f:
+        header = f.readline()
+    _, nx, ny, nz = map(int, header.split())
     radius = (5.000 / (voxel_size * 2) + buf) * voxel_size
     height = nz * voxel_size
-    center = [nx / 2 * voxel_size, ny / 2 * voxel_size, 0]
+    center = (nx / 2 * voxel_size, ny / 2 * voxel_size, 0)
     return radius, height, center
 
 
+def compute_die_stats(voxel_data, voxel_size: float, buf: int, mtime_ns: Optional[int] = None):
+    # Cache on modification time as well as path, so a rewritten voxel file is re-read
+    if mtime_ns is None:
+        mtime_ns = os.stat(voxel_data).st_mtime_ns
+    radius, height, center = _die_stats(str(voxel_data), mtime_ns, voxel_size, buf)
+    return radius, height, list(center)
+
+
+def _coerce_column(values: list[str]) -> list:
+    """Convert a column of CSV strings to ints, or else floats, if every entry allows it."""
+    for kind in (int, float):
+        try:
+            return [kind(value) for value in values]
+        except ValueError:
+            pass
+    return values
+
+
+@functools.lru_cache(maxsize=8)
+def _load_uq_spec(uq_spec: str, mtime_ns: int) -> dict[str, list]:
+    # UQ specifications are small, so the csv module avoids importing pandas just to read them
+    # utf-8-sig drops the byte order mark written by spreadsheet "CSV UTF-8" exports
+    with open(uq_spec, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        try:
+            header = next(reader)
+        except StopIteration:
+            raise ValueError(f"{uq_spec}: UQ specification is empty") from None
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError(f"{uq_spec}, line {reader.line_num}: expected {len(header)} values, got {len(row)}")
+            for name, value in zip(header, row):
+                if not value.strip():
+                    raise ValueError(f"{uq_spec}, line {reader.line_num}: missing value for '{name}'")
+            rows.append(row)
+    columns = list(zip(*rows)) or [()] * len(header)
+    return {name: _coerce_column(list(values)) for name, values in zip(header, columns)}
+
+
+def load_uq_specification(uq_spec: Path) -> dict[str, list]:
+    """Load a UQ specification CSV as a dictionary of parameter name to list of values, cached by path and mtime."""
+    return _load_uq_spec(str(uq_spec), uq_spec.stat().st_mtime_ns)
+
+
 def set_diagnostic_options(experiment: ExperimentConfig, save_forces: int, save_strain_energy: int, save_swarm: int, save_solution: int,
                            save_diagnostics: int, save: bool) -> None:
     """
@@ -111,19 +171,33 @@ def set_diagnostic_options(experiment: ExperimentConfig, save_forces: int, save_
 
 
 def generate_mesh(characteristic_length: float, voxel_data: Path,
-                  voxel_size: float, voxel_buf: int, scratch_dir: Path) -> Path:
+                  voxel_size: float, voxel_buf: int, scratch_dir: Path, mtime_ns: Optional[int] = None) -> Path:
+    """Get the mesh file for the given voxel data, generating it if necessary.
+
+    Results are memoized on the arguments and the modification time of the voxel data, which is read from the
+    filesystem unless given.
+    """
+    if mtime_ns is None:
+        try:
+            mtime_ns = voxel_data.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Voxel data {voxel_data} does not exist") from None
+    return _generate_mesh(characteristic_length, voxel_data, voxel_size, voxel_buf, scratch_dir, mtime_ns)
+
+
+@functools.lru_cache(maxsize=32)
+def _generate_mesh(characteristic_length: float, voxel_data: Path,
+                   voxel_size: float, voxel_buf: int, scratch_dir: Path, mtime_ns: int) -> Path:
     mesh_dir = scratch_dir / "meshes"
     if not mesh_dir.exists():
         mesh_dir.mkdir(parents=True, exist_ok=True)
-    if not voxel_data.exists():
-        raise FileNotFoundError(f"Voxel data {voxel_data} does not exist")
     mesh_file = mesh_dir / f"cylinder_{voxel_data.stem}_CL{characteristic_length}.cgns"
     if mesh_file.exists():
         console.print(f"[info]Using existing mesh [/]{mesh_file}")
         return mesh_file.resolve()
 
     element_order = 1
-    radius, height, center = compute_die_stats(voxel_data, voxel_size, voxel_buf)
+    radius, height, center = compute_die_stats(voxel_data, voxel_size, voxel_buf, mtime_ns)
     square_radius = radius * np.sqrt(0.125)
 
     layers = int(np.ceil(height / characteristic_length) + 1)
@@ -148,7 +222,7 @@ def generate_mesh(characteristic_length: float, voxel_data: Path,
     gmsh.initialize()
 
     # set mesh options
-    gmsh.option.setNumber("General.NumThreads", cpu_count())
+    gmsh.option.setNumber("General.NumThreads", os.cpu_count() or 1)
     gmsh.option.setNumber("Mesh.Algorithm3D", 10)
     gmsh.option.setNumber("Mesh.ElementOrder", element_order)
     gmsh.option.setNumber("Mesh.HighOrderOptimize", 1 if element_order > 1 else 0)
@@ -183,34 +257,41 @@ def generate_mesh(characteristic_length: float, voxel_data: Path,
     s2 = gmsh.model.geo.addPlaneSurface([cl2])
     s3 = gmsh.model.geo.addPlaneSurface([cl3])
 
-    for c in [l5, l7, l9]:
-        gmsh.model.geo.mesh.setTransfiniteCurve(c, NPTS_RADIAL)
-    for c in [l1, l2, l3, l4, l6, l8]:
-        gmsh.model.geo.mesh.setTransfiniteCurve(c, NPTS_SQUARE)
-    for s in [s1, s2, s3]:
-        gmsh.model.geo.mesh.setTransfiniteSurface(s)
-        gmsh.model.geo.mesh.setRecombine(SURFACE, s)
+    # gmsh.model.geo has no batched transfinite API, so bind the setters once for the loops below
+    set_transfinite_curve = gmsh.model.geo.mesh.setTransfiniteCurve
+    set_transfinite_surface = gmsh.model.geo.mesh.setTransfiniteSurface
+    set_recombine = gmsh.model.geo.mesh.setRecombine
+
+    def set_transfinite(curves, num_points):
+        for c in curves:
+            set_transfinite_curve(c, num_points)
+
+    def set_transfinite_quads(surfaces):
+        for s in surfaces:
+            set_transfinite_surface(s)
+            set_recombine(SURFACE, s)
+
+    radial_curves = (l5, l7, l9)
+    set_transfinite(radial_curves, NPTS_RADIAL)
+    set_transfinite((l1, l2, l3, l4, l6, l8), NPTS_SQUARE)
+    set_transfinite_quads((s1, s2, s3))
 
     gmsh.model.geo.synchronize()
 
-    def add_quadrant(orig, angle):
-        quadrant = gmsh.model.geo.copy(orig)
+    def set_quadrant_transfinite(quadrant):
+        # Transfinite settings are not reliably carried over by geo.copy, so tag the copies explicitly
         lines = [id for dim, id in quadrant if dim == EDGE]
-        for l in lines:
-            if l - lines[0] + 1 in [l5, l7, l9]:
-                gmsh.model.geo.mesh.setTransfiniteCurve(l, NPTS_RADIAL)
-            else:
-                gmsh.model.geo.mesh.setTransfiniteCurve(l, NPTS_SQUARE)
-        for s in filter(lambda x: x[0] == SURFACE, quadrant):
-            gmsh.model.geo.mesh.setTransfiniteSurface(s[1])
-            gmsh.model.geo.mesh.setRecombine(s[0], s[1])
-        gmsh.model.geo.rotate(quadrant, center[0], center[1], center[2], 0, 0, 1, angle)
-        return list(set(gmsh.model.getEntities()).intersection(quadrant))
+        radial = [l for l in lines if l - lines[0] + 1 in radial_curves]
+        set_transfinite(radial, NPTS_RADIAL)
+        set_transfinite([l for l in lines if l not in radial], NPTS_SQUARE)
+        set_transfinite_quads([id for dim, id in quadrant if dim == SURFACE])
 
+    # Rotate each copy into place before making the next; gmsh cannot rotate copies made together in one batch
     quadrant1 = gmsh.model.getEntities()
-    add_quadrant(quadrant1, np.pi / 2)
-    add_quadrant(quadrant1, np.pi)
-    add_quadrant(quadrant1, 3 * np.pi / 2)
+    for angle in (np.pi / 2, np.pi, 3 * np.pi / 2):
+        quadrant = gmsh.model.geo.copy(quadrant1)
+        set_quadrant_transfinite(quadrant)
+        gmsh.model.geo.rotate(quadrant, center[0], center[1], center[2], 0, 0, 1, angle)
 
     gmsh.model.geo.removeAllDuplicates()
     gmsh.model.geo.synchronize()
@@ -229,6 +310,7 @@ def generate_mesh(characteristic_length: float, voxel_data: Path,
     # generate mesh
     gmsh.model.mesh.generate(3)
 
+    # Copy the volume mesh into a single discrete entity, so the CGNS file holds one element section
     node_tags, coords, parametric_coords = gmsh.model.mesh.getNodes()
     types, tags, nodes = gmsh.model.mesh.getElements(VOLUME)
     gmsh.finalize()
@@ -245,15 +327,40 @@ def generate_mesh(characteristic_length: float, voxel_data: Path,
         raise RuntimeError(f"Failed to generate mesh file: {mesh_file}")
 
     print(f"[info]Mesh saved to [/]{mesh_file}")
-    return mesh_file
+    return mesh_file.resolve()
+
+
+@functools.lru_cache(maxsize=32)
+def _static_mesh_options(voxel_data: Path, voxel_size: float, mesh_file: Path) -> str:
+    """Mesh options which depend only on the voxel data and mesh file, shared by every experiment using them.
+
+    Both paths are expected to be resolved already.
+    """
+    return '\n'.join([
+        "",
+        "# Mesh options generated by press_common.generate_mesh",
+        "mpm_voxel:",
+        f"  filename: {voxel_data}",
+        f"  pixel_size: {voxel_size}",
+        "",
+        "dm_plex:",
+        f"  filename: {mesh_file}",
+        "  cgns_parallel:",
+        "  box_label:",
+        "  dim: 3",
+        "  simplex: 0",
+        "",
+    ]) + '\n'
 
 
 class PressExperiment(ExperimentConfig, ABC):
     """Die press experiment using voxelized CT data and a synthetic mesh, using sticky air for voids"""
-    @property
-    @abstractmethod
+    __slots__ = ('voxel_data', '_voxel_data_resolved', '_voxel_data_mtime_ns', 'characteristic_length', 'load_fraction',
+                 'boundary', 'scratch_dir', 'voxel_size', 'voxel_buf', 'material', 'seed', 'radius', 'height', 'center')
+
+    @functools.cached_property
     def solver_config(self) -> str:
-        pass
+        return load_yaml_resource('common_solver.yml')
 
     @property
     @abstractmethod
@@ -276,13 +383,17 @@ class PressExperiment(ExperimentConfig, ABC):
             pretty_name: str | None = None,
             description: str | None = None,
     ):
-        if not voxel_data.exists():
-            raise FileNotFoundError(f"Voxel data {voxel_data} does not exist")
+        try:
+            voxel_data_stat = voxel_data.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Voxel data {voxel_data} does not exist") from None
         if characteristic_length <= 0:
             raise ValueError(f"characteristic_length must be greater than 0, got {characteristic_length:f}")
         if load_fraction <= 0.0 or load_fraction > 1.0:
             raise ValueError(f"load_fraction must be in (0.0, 1.0], got {load_fraction}")
         self.voxel_data: Path = voxel_data
+        self._voxel_data_resolved: Path = voxel_data.resolve()
+        self._voxel_data_mtime_ns: int = voxel_data_stat.st_mtime_ns
         self.characteristic_length: float = characteristic_length
         self.load_fraction: float = load_fraction
         self.boundary: PressBoundary = boundary
@@ -290,10 +401,15 @@ class PressExperiment(ExperimentConfig, ABC):
         self.voxel_size: float = voxel_size
         self.voxel_buf: int = voxel_buf
         self.material: MaterialType = material
-        self.seed: int = seed or np.random.SeedSequence().generate_state(1)[0]
-        self.radius, self.height, self.center = compute_die_stats(self.voxel_data, self.voxel_size, self.voxel_buf)
-        base_config = self.solver_config + '\n' + self.boundary.snes_options + '\n' + self.material_config + '\n'
-        base_config += f'mpm_grains_label_value: {config.get_fallback("GRAIN_IDS", "2")}\n'
+        self.seed: int = seed if seed is not None else secrets.randbits(32)
+        self.radius, self.height, self.center = compute_die_stats(self.voxel_data, self.voxel_size, self.voxel_buf,
+                                                                   self._voxel_data_mtime_ns)
+        base_config = [
+            self.solver_config, '\n',
+            self.boundary.snes_options, '\n',
+            self.material_config, '\n',
+            f'mpm_grains_label_value: {config.get_fallback("GRAIN_IDS", "2")}\n',
+        ]
         name = f"{base_name}-{voxel_data.stem}-{material.value}-CL{characteristic_length}-LF{load_fraction}-{self.boundary.name}"
         pretty_name = pretty_name or "Ratel iMPM Press Experiment"
         description = description or self.__doc__
@@ -318,45 +434,33 @@ class PressExperiment(ExperimentConfig, ABC):
             self.voxel_data,
             self.voxel_size,
             self.voxel_buf,
-            self.scratch_dir
+            self.scratch_dir,
+            self._voxel_data_mtime_ns,
         )
 
-        options: str = '\n'.join([
-            "",
-            "# Mesh options generated by press_common.generate_mesh",
-            "mpm_voxel:",
-            f"  filename: {self.voxel_data.resolve()}",
-            f"  pixel_size: {self.voxel_size}",
-            "",
-            "dm_plex:",
-            f"  filename: {mesh_file.resolve()}",
-            "  cgns_parallel:",
-            "  box_label:",
-            "  dim: 3",
-            "  simplex: 0",
-            "",
+        options: str = _static_mesh_options(self._voxel_data_resolved, self.voxel_size, mesh_file) + '\n'.join([
             "remap:",
             f"  direction: z",
             f"  scale: {(1 - self.load_fraction)} # (1 - load_fraction) to match displacement",
             "",
         ])
-        options += self.boundary.options(self.center, self.radius, self.height, self.load_fraction)
+        options += cached_options(self.boundary, self.center, self.radius, self.height, self.load_fraction)
 
         print(f"[info]Generated mesh options:[/]")
-        syntax = Syntax(options, "yaml")
-        print(syntax)
+        if console.is_terminal:
+            from rich.syntax import Syntax
+            print(Syntax(options, "yaml"))
+        else:
+            # Skip syntax highlighting when output is not interactive, e.g. batch jobs or redirected sweeps
+            print(options, markup=False, highlight=False)
         return options
 
-    @property
+    @functools.cached_property
     def mesh_options(self) -> str:
-        if hasattr(self, '_mesh_options'):
-            return getattr(self, '_mesh_options')
-        options = self.get_mesh()
-        setattr(self, '_mesh_options', options)
-        return options
+        return self.get_mesh()
 
     def __str__(self) -> str:
-        output = '\n'.join([
+        lines = [
             f'[h1]{self.pretty_name}[/]',
             f'{self.description}',
             f"\n[h2]Mesh Options[/]",
@@ -370,11 +474,11 @@ class PressExperiment(ExperimentConfig, ABC):
             f"  • Load fraction: {self.load_fraction}",
             f"  • Final Height: {self.height * self.load_fraction}",
             f"  • Boundary Condition: {self.boundary}",
-        ])
+        ]
         if self.user_options:
-            output += "\n[h2]User Options[/]\n"
-            output += "\n".join([f"  • {key}: {value}" for key, value in self.user_options.items()])
-        return output
+            lines.append("[h2]User Options[/]")
+            lines.extend(f"  • {key}: {value}" for key, value in self.user_options.items())
+        return '\n'.join(lines)
 
     @classmethod
     def create_options_callback(cls):
@@ -387,8 +491,9 @@ class PressExperiment(ExperimentConfig, ABC):
             voxel_size: Annotated[float, typer.Option('--voxel-size', '--size', default_factory=lambda: config.get("VOXEL_SIZE"), callback=callback_is_set, help="Voxel side length, should be constant for a given voxel dump file")],
             material: Annotated[MaterialType, typer.Option('--material', help="Material model to use")],
             load_fraction: Annotated[float, typer.Option(
-                '--load-fraction', '--lf', min=0.0, max=1.0, help="Percent of total cylinder height to compress"
-            )] = float(config.get_fallback("LOAD_FRACTION", 0.4)),
+                '--load-fraction', '--lf', min=0.0, max=1.0, default_factory=lambda: float(config.get_fallback("LOAD_FRACTION", 0.4)),
+                help="Percent of total cylinder height to compress"
+            )],
             voxel_buffer: Annotated[int, typer.Option(help="Number of buffer voxel widths to add to the mesh")] = 0,
             bc_type: Annotated[BoundaryType, typer.Option('--bc', '--boundary', '--bc-type',
                                                           help="Type of boundary condition to apply")] = BoundaryType.CLAMPED,
@@ -558,7 +663,7 @@ class PressExperiment(ExperimentConfig, ABC):
         ):
             """Run a parameter sweep using the Flux job scheduler."""
             ctx.obj.experiment.user_options = ctx.args
-            uq_params = pd.read_csv(uq_spec).to_dict(orient='list')
+            uq_params = load_uq_specification(uq_spec)
             flux.uq(
                 ctx.obj.experiment,
                 machine=ctx.obj.machine,
@@ -594,21 +699,46 @@ class PressExperiment(ExperimentConfig, ABC):
                 "--ts_max_steps", f"{num_steps}"
             ] + (args if args else [])
 
+            # Generate the mesh once, before any copies are made
+            ctx.obj.experiment.prime_caches()
+            (output_dir / 'flux_output').mkdir(parents=True, exist_ok=True)
+            print(f'{ctx.obj.experiment}')
+            print("")
+
             max_length = int(math.ceil(math.log10(max(num_processes) + 1)))
+            jobs = []
             for np in num_processes:
                 for sample in range(num_samples):
                     np_str = f"{np}".zfill(max_length)
-                    ctx.obj.experiment._name = base_name + f"-np{np_str}" + (f"-s{sample+1}" if num_samples > 1 else "")
+                    experiment = copy.copy(ctx.obj.experiment)
+                    experiment._name = base_name + f"-np{np_str}" + (f"-s{sample+1}" if num_samples > 1 else "")
+                    jobs.append((experiment, np))
+
+            def generate(job):
+                experiment, np = job
+                # Capture output to avoid cluttering console, captures are per-thread
+                console.begin_capture()
+                try:
                     script_file, _ = flux.generate(
-                        ctx.obj.experiment,
+                        experiment,
                         machine=ctx.obj.machine,
                         num_processes=np,
                         max_time=ctx.obj.max_time,
                         output_dir=output_dir,
                     )
-                    if ctx.obj.dry_run:
-                        print(f"Generated script saved to", script_file)
-                        print("Dry run, exiting.")
-                    else:
-                        flux.run(script_file)
+                finally:
+                    console.end_capture()
+                return script_file
+
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as executor:
+                script_files = list(executor.map(generate, jobs))
+
+            for script_file in script_files:
+                if ctx.obj.dry_run:
+                    print(f"Generated script saved to", script_file)
+                else:
+                    flux.run(script_file)
+            if ctx.obj.dry_run:
+                print("Dry run, exiting.")
         return app
@@ -1,51 +1,46 @@
 from pathlib import Path
-import importlib.resources
-from typing import ClassVar
+import functools
+from typing import ClassVar, Final
 
-from .press_common import PressExperiment, MaterialType
+from .press_common import PressExperiment, MaterialType, load_yaml_resource
+
+
+_BASE_NAME: Final[str] = Path(__file__).stem.replace('_', '-')
+
+
+_DAMAGE_MESH_OPTIONS: Final[str] = (
+    "\n# Specific options for no air die experiment"
+    "\nmpm_grains_characteristic_length: {cl4}"
+    "\nmpm_binder_characteristic_length: {cl4}"
+    "\nmpm_stabilization_background_stiffness_characteristic_length: {cl4}\n"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _damage_mesh_options(characteristic_length: float) -> str:
+    return _DAMAGE_MESH_OPTIONS.format_map({'cl4': characteristic_length * 4})
 
 
 class PressNoAirExperiment(PressExperiment):
     """Die press experiment using voxelized CT data and a synthetic mesh"""
-    @property
-    def solver_config(self) -> str:
-        if hasattr(self, '_solver_options'):
-            return getattr(self, '_solver_options')
-        options = (importlib.resources.files(__package__ or '') / 'yml' / 'common_solver.yml').read_text()
-        setattr(self, '_solver_options', options)
-        return getattr(self, '_solver_options')
-
-    @property
+    @functools.cached_property
     def material_config(self) -> str:
-        if hasattr(self, '_material_options'):
-            return getattr(self, '_material_options')
-        options = (importlib.resources.files(__package__ or '') / 'yml' /
-                   f'press_no_air_{self.material.value}.yml').read_text()
+        options = load_yaml_resource(f'press_no_air_{self.material.value}.yml')
         if self.material == MaterialType.MONOCLINIC or self.material == MaterialType.TRICLINIC:
             options += f"\nmpm_grains_random_seed: {self.seed}\n"
-        setattr(self, '_material_options', options)
-        return getattr(self, '_material_options')
+        return options
 
     base_name: ClassVar[str] = 'no-air'
 
     def __init__(self, *super_args, **super_kwargs):
-        super().__init__(*super_args, **super_kwargs, base_name=Path(__file__).stem.replace('_', '-'),
+        super().__init__(*super_args, **super_kwargs, base_name=_BASE_NAME,
                          pretty_name="Ratel iMPM Press Experiment, no air, background stabilization", description=self.__doc__)
 
-    @property
+    @functools.cached_property
     def mesh_options(self) -> str:
-        if hasattr(self, '_mesh_options'):
-            return getattr(self, '_mesh_options')
         options = super().mesh_options
         if self.material == MaterialType.DAMAGE:
-            options += '\n' + '\n'.join([
-                "# Specific options for no air die experiment",
-                f"mpm_grains_characteristic_length: {self.characteristic_length * 4}",
-                f"mpm_binder_characteristic_length: {self.characteristic_length * 4}",
-                f"mpm_stabilization_background_stiffness_characteristic_length: {self.characteristic_length * 4}",
-                "",
-            ])
-        setattr(self, '_mesh_options', options)
+            options += _damage_mesh_options(self.characteristic_length)
         return options
 
 
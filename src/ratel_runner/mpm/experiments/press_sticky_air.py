@@ -1,48 +1,41 @@
 from pathlib import Path
-import importlib.resources
-from typing import ClassVar
+import functools
+from typing import ClassVar, Final
 
-from .press_common import PressExperiment
+from .press_common import PressExperiment, load_yaml_resource
+
+
+_BASE_NAME: Final[str] = Path(__file__).stem.replace('_', '-')
+
+
+_STICKY_AIR_MESH_OPTIONS: Final[str] = (
+    "\n# Specific options for sticky air die experiment"
+    "\nmpm_void_characteristic_length: {cl4}"
+    "\nmpm_grains_characteristic_length: {cl4}"
+    "\nmpm_binder_characteristic_length: {cl4}\n"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _sticky_air_mesh_options(characteristic_length: float) -> str:
+    return _STICKY_AIR_MESH_OPTIONS.format_map({'cl4': characteristic_length * 4})
 
 
 class PressStickyAirExperiment(PressExperiment):
     """Die press experiment using voxelized CT data and a synthetic mesh, using sticky air for voids"""
-    @property
-    def solver_config(self) -> str:
-        if hasattr(self, '_solver_options'):
-            return getattr(self, '_solver_options')
-        options = (importlib.resources.files(__package__ or '') / 'yml' / 'common_solver.yml').read_text()
-        setattr(self, '_solver_options', options)
-        return getattr(self, '_solver_options')
-
-    @property
+    @functools.cached_property
     def material_config(self) -> str:
-        if hasattr(self, '_material_options'):
-            return getattr(self, '_material_options')
-        options = (importlib.resources.files(__package__ or '') / 'yml' / 'press_sticky_air.yml').read_text()
-        setattr(self, '_material_options', options)
-        return getattr(self, '_material_options')
+        return load_yaml_resource('press_sticky_air.yml')
 
     base_name: ClassVar[str] = 'sticky-air'
 
     def __init__(self, *super_args, **super_kwargs,):
-        super().__init__(*super_args, **super_kwargs, base_name=Path(__file__).stem.replace('_', '-'),
+        super().__init__(*super_args, **super_kwargs, base_name=_BASE_NAME,
                          pretty_name="Ratel iMPM Press Experiment, sticky air", description=self.__doc__)
 
-    @property
+    @functools.cached_property
     def mesh_options(self) -> str:
-        if hasattr(self, '_mesh_options'):
-            return getattr(self, '_mesh_options')
-        options = super().mesh_options
-        options += '\n' + '\n'.join([
-            "# Specific options for sticky air die experiment",
-            f"mpm_void_characteristic_length: {self.characteristic_length * 4}",
-            f"mpm_grains_characteristic_length: {self.characteristic_length * 4}",
-            f"mpm_binder_characteristic_length: {self.characteristic_length * 4}",
-            "",
-        ])
-        setattr(self, '_mesh_options', options)
-        return options
+        return super().mesh_options + _sticky_air_mesh_options(self.characteristic_length)
 
 
 app = PressStickyAirExperiment.create_app()
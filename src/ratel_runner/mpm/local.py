@@ -1,8 +1,10 @@
 # This module is responsible for running experiments locally.
 from pathlib import Path
 from rich import print
+import os
 import subprocess
-import datetime
+import shutil
+import time
 from typing import Optional
 
 from ..helper import config
@@ -16,15 +18,16 @@ def run(experiment: ExperimentConfig, num_processes: int = 1, ratel_dir: Optiona
     if ratel_dir is None:
         ratel_dir = Path(config.get_fallback('RATEL_DIR')).resolve()
     if scratch_dir is None:
-        scratch_dir = Path(config.get_fallback('SCRATCH_DIR')).resolve()
+        scratch_dir = Path(config.get_fallback('SCRATCH_DIR'))
+    scratch_dir = scratch_dir.resolve()
     output_dir = Path(config.get_fallback('OUTPUT_DIR', Path.cwd() / 'output')).resolve()
     output_dir.mkdir(parents=True, exist_ok=True)
-    scratch_dir = Path(config.get_fallback('SCRATCH_DIR', scratch_dir)).resolve()
+    runs_dir = scratch_dir / 'output'
     if out is not None:
-        run_dir = scratch_dir / 'output' / out
+        # `out` may be absolute or contain `..`, so resolve again after joining
+        run_dir = runs_dir.joinpath(out).resolve()
     else:
-        run_dir = scratch_dir / 'output' / f"{experiment.name}-{datetime.datetime.now().strftime(r'%Y-%m-%d_%H-%M-%S')}"
-    run_dir = run_dir.resolve()
+        run_dir = runs_dir / f"{experiment.name}-{time.strftime(r'%Y-%m-%d_%H-%M-%S')}"
     print(f'{experiment}')
     print("")
     print(f"[h2]Simulation Options[/]")
@@ -35,14 +38,22 @@ def run(experiment: ExperimentConfig, num_processes: int = 1, ratel_dir: Optiona
     print("")
 
     if run_dir.exists():
-        for file in run_dir.glob("*"):
-            file.unlink()
-        run_dir.rmdir()
+        # Only ever clear a previous run, never a directory that `out` happens to point at
+        if run_dir == runs_dir or not run_dir.is_relative_to(runs_dir):
+            raise ValueError(f"Refusing to remove {run_dir}, which is not a run directory in {runs_dir}")
+        if not dry_run:
+            shutil.rmtree(run_dir)
     run_dir.mkdir(parents=True, exist_ok=True)
     output_link = output_dir / run_dir.name
-    if output_link.exists():
-        output_link.unlink()
-    output_link.symlink_to(run_dir, True)
+    # Swap the link atomically so a concurrent launch never sees it missing
+    tmp_link = output_link.with_name(f".{output_link.name}.{os.getpid()}.tmp")
+    tmp_link.unlink(missing_ok=True)
+    tmp_link.symlink_to(run_dir, True)
+    try:
+        os.replace(tmp_link, output_link)
+    except OSError:
+        tmp_link.unlink()
+        raise
 
     config_file = experiment.write_config(run_dir)
     out_file = run_dir / "stdout.txt"
@@ -50,7 +61,7 @@ def run(experiment: ExperimentConfig, num_processes: int = 1, ratel_dir: Optiona
     ratel_exe = ratel_dir / 'bin' / 'ratel-quasistatic'
 
     options = [
-        "-options_file", f"{config_file.resolve()}",
+        "-options_file", f"{config_file}",
     ]
 
     if num_processes > 1:
@@ -65,7 +76,8 @@ def run(experiment: ExperimentConfig, num_processes: int = 1, ratel_dir: Optiona
         return
 
     if not dry_run:
-        with out_file.open('wb') as outfile, err_file.open('wb') as err:
-            subprocess.run(cmd_arr, cwd=run_dir.resolve(), stdout=outfile, stderr=err)
+        # Only the solver writes to these files, so skip Python's write buffers
+        with out_file.open('wb', buffering=0) as outfile, err_file.open('wb', buffering=0) as err:
+            subprocess.run(cmd_arr, cwd=run_dir, stdout=outfile, stderr=err)
     else:
         print(f"Command: {' '.join(cmd_arr)}")
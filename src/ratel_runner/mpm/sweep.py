@@ -6,9 +6,13 @@ from pathlib import Path
 from typing import Union
 import typer
 
+from ..helper.utilities import yaml_full_loader
+
 __doc__ = "Load and write sweep specifications for Ratel iMPM experiments"
 __all__ = ['load_sweep_specification', 'write_sweep_specification']
 
+FullLoader = yaml_full_loader()
+
 console = rich.get_console()
 print = console.print
 
@@ -58,6 +62,9 @@ def range_parser(loader: Union[yaml.Loader, yaml.FullLoader, yaml.UnsafeLoader],
 
 yaml.add_constructor('!parameter_range', range_parser)
 yaml.add_implicit_resolver('!parameter_range', range_pattern)
+if FullLoader is not yaml.FullLoader:
+    yaml.add_constructor('!parameter_range', range_parser, Loader=FullLoader)
+    yaml.add_implicit_resolver('!parameter_range', range_pattern, Loader=FullLoader)
 yaml.add_representer(ParameterRange, range_representer)
 
 
@@ -70,7 +77,7 @@ def load_sweep_specification(ctx: typer.Context, path: Path, quiet: bool = False
     and values are either a list of values or a range in the format start:end:count.
     """
     with open(path, 'r') as file:
-        data = yaml.full_load(file)
+        data = yaml.load(file, Loader=FullLoader)
         if not isinstance(data, dict):
             raise ValueError(f"Sweep specification file {path} is not a valid YAML file")
     sweep_parameters = {}
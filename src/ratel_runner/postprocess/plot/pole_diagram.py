@@ -1,10 +1,9 @@
 from importlib.util import find_spec
 from pathlib import Path
-import yaml
 from rich import print
 import typer
 
-from ...helper.utilities import run_once
+from ...helper.utilities import run_once, yaml_full_loader
 
 
 @run_once
@@ -22,11 +21,16 @@ def check_imports():
 
 @run_once
 def import_all():
-    global plt, pv, Figure, np
+    global plt, pv, Figure, np, yaml, FullLoader
+    import matplotlib
+    # Figures are only ever written to files, so skip any interactive backend
+    matplotlib.use('Agg')
     import matplotlib.pyplot as plt
     from matplotlib.figure import Figure
     import pyvista as pv
     import numpy as np
+    import yaml
+    FullLoader = yaml_full_loader()
     global Phase, Lattice, Structure, Orientation, Misorientation, symmetry, Miller, Vector3d
     from orix.crystal_map import Phase
     from diffpy.structure import Lattice, Structure
@@ -41,16 +45,19 @@ check_imports()
 app = typer.Typer()
 
 
-def vec_rotate(n, theta, v):
-    n_dot_v = np.einsum("ij,ij->i", n, v)
-    cos_theta = np.cos(theta)
-    n_cross_v = np.cross(n, v)
-    v_rot = cos_theta[:, None] * v + (np.sin(theta))[:, None] * n_cross_v + (n_dot_v * (1 - cos_theta))[:, None] * n
+def rotate_z_axis(q):
+    """Rotate the z unit vector by each unit quaternion (w, x, y, z) in `q`."""
+    # Third column of the rotation matrix of q, so only the entries that multiply e_z are formed
+    w, x, y, z = q.T
+    v_rot = np.empty((q.shape[0], 3))
+    v_rot[:, 0] = 2 * (x * z + w * y)
+    v_rot[:, 1] = 2 * (y * z - w * x)
+    v_rot[:, 2] = 1 - 2 * (x * x + y * y)
     return v_rot
 
 
 def read_mesh(file, time_step=0):
-    """Read a mesh from a file."""
+    """Read the point data of the grain (material > 1) points from a swarm file."""
     reader: pv.XdmfReader = pv.get_reader(file)  # type: ignore
     reader.set_active_time_point(time_step)
     reader.disable_all_point_arrays()
@@ -58,60 +65,55 @@ def read_mesh(file, time_step=0):
     reader.enable_point_array("elastic parameters")
     reader.enable_point_array("model state")
     mesh: pv.DataSet = reader.read()
-    grains = mesh.threshold(1.5, scalars='material', method='upper', preference='point')
+    # Swarm cells are single vertices, so masking the point arrays selects the same points as
+    # `mesh.threshold(1.5, scalars='material', method='upper')` without VTK rebuilding the cells
+    grains = np.asarray(mesh.point_data["material"]).ravel() >= 1.5
+    point_data = {name: np.asarray(mesh.point_data[name])[grains] for name in ("elastic parameters", "model state")}
     del mesh
-    return grains
+    return point_data
 
 
-def pole_plot_bounds(
-    poles,
-    resolution: float = 1,
-    sigma: float = 5,
-    log: bool = False,
-):
-    from orix import measure  # pep8-ignore
-    hist, _ = measure.pole_density_function(
-        poles,
-        resolution=resolution,
-        sigma=sigma,
-        log=log,
-        hemisphere="upper",
-    )
-    vmin = hist.min()
-    vmax = hist.max()
-    hist, _ = measure.pole_density_function(
-        poles,
-        resolution=resolution,
-        sigma=sigma,
-        log=log,
-        hemisphere="lower",
-    )
-    vmin = min(vmin, hist.min())
-    vmax = max(vmax, hist.max())
-    return vmin, vmax
-
-
-def compute_poles(mesh):
-    props = np.asarray(mesh.point_data["elastic parameters"])
-    state = np.asarray(mesh.point_data["model state"])
+def compute_poles(point_data):
+    props = point_data["elastic parameters"]
+    state = point_data["model state"]
     npts = props.shape[0]
     print(f"Computing pole orientations for {npts} points...")
-    F = state.reshape((npts, 3, 3)) + np.eye(3)
-    Finv = np.linalg.inv(F)
-    J = np.linalg.det(F)
     n0 = props[:, 21:24]
-    theta0 = props[:, 24]
-    V = np.zeros_like(n0)
-    V[:, 2] = 1.
-    ab_normal0 = vec_rotate(n0, theta0, V)
-    ab_normal = J[:, None] * np.einsum("ijk,ij->ik", Finv, ab_normal0)
-    vab0 = Vector3d(ab_normal0)
-    vab = Vector3d(ab_normal)
-    axes = vab0.cross(vab)
-    axes /= axes.norm
-    angles = vab0.angle_with(vab)
-    print(f"Computed pole orientations for {axes.shape[0]} points.")
-    return axes, angles, Vector3d(n0), theta0
+    half_theta0 = props[:, 24] / 2
+    # Initial grain orientations as unit quaternions (cos(theta/2), sin(theta/2) n), evaluated once and used both
+    # for the reference normals and, by the caller, for the orientations themselves
+    q0 = np.empty((npts, 4))
+    q0[:, 0] = np.cos(half_theta0)
+    q0[:, 1:] = n0 * (np.sin(half_theta0) / np.linalg.norm(n0, axis=1))[:, None]
+    ab_normal0 = rotate_z_axis(q0)
+    # Nanson's formula, n = J F^{-T} N = cof(F) N, with the cofactors written out so no batched LAPACK inverse or
+    # determinant is needed. F = I + state is split into one contiguous array per component so each product
+    # streams unit-stride memory.
+    F00, F01, F02, F10, F11, F12, F20, F21, F22 = np.ascontiguousarray((state.reshape((npts, 9)) + np.eye(3).ravel()).T)
+    N0, N1, N2 = np.ascontiguousarray(ab_normal0.T)
+    ab_normal = np.empty((3, npts))
+    ab_normal[0] = (F11 * F22 - F12 * F21) * N0 + (F12 * F20 - F10 * F22) * N1 + (F10 * F21 - F11 * F20) * N2
+    ab_normal[1] = (F02 * F21 - F01 * F22) * N0 + (F00 * F22 - F02 * F20) * N1 + (F01 * F20 - F00 * F21) * N2
+    ab_normal[2] = (F01 * F12 - F02 * F11) * N0 + (F02 * F10 - F00 * F12) * N1 + (F00 * F11 - F01 * F10) * N2
+    ab_normal = ab_normal.T
+    # Rotation taking each initial normal a to its deformed one b. With r = |a||b|, c = a x b = r sin(t) u and
+    # d = a . b = r cos(t), the quaternion (r + d, c) is a positive multiple of (cos(t/2), sin(t/2) u).
+    # orix normalizes on construction, so no trig or unit axis is needed
+    q = np.empty((npts, 4))
+    q[:, 1:] = np.cross(ab_normal0, ab_normal)
+    d = np.einsum("ij,ij->i", ab_normal0, ab_normal)
+    q[:, 0] = np.sqrt(np.einsum("ij,ij->i", q[:, 1:], q[:, 1:]) + d * d) + d
+    print(f"Computed pole orientations for {npts} points.")
+    return q, q0
+
+
+def save_pole_figure(fig, title: str, out: Path, log: bool):
+    """Title, lay out, and add a colorbar to a pole density figure, then save and close it."""
+    fig.suptitle(title)
+    fig.tight_layout()
+    fig.colorbar(fig.axes[-1].collections[-1], ax=fig.axes, label='log(MRD)' if log else 'MRD')
+    fig.savefig(out, dpi=300)
+    plt.close(fig)
 
 
 @app.command()
@@ -152,7 +154,7 @@ def pole_diagram(
             raise FileNotFoundError(f"Swarm file {swarm_file_path} not found.")
     options_file = run_dir / "options.yml"
     with open(options_file, 'r') as file:
-        data = yaml.full_load(file)
+        data = yaml.load(file, Loader=FullLoader)
     try:
         grain_options = data['mpm']['grains']
         a = grain_options['a']
@@ -185,60 +187,44 @@ def pole_diagram(
             phase = triclinic
             print(f"Using triclinic phase with lattice parameters: {phase.structure.lattice}")
 
-    axes, angles, axes0, angles0 = compute_poles(read_mesh(run_dir / swarm_file, time_step=time_step))
+    q, q0 = compute_poles(read_mesh(run_dir / swarm_file, time_step=time_step))
 
-    O0 = Orientation.from_axes_angles(axes0, angles0, symmetry=phase.point_group)
+    O0 = Orientation(q0)
+    O0.symmetry = phase.point_group
     g = Miller(hkl=[0, 0, 1], phase=phase).symmetrise(unique=True)
-    poles0: Vector3d = O0.inv().outer(g, lazy=True, chunk_size=200000)  # type: ignore
-    poles: Vector3d = (Misorientation.from_axes_angles(axes, angles) * O0).inv().outer(  # type: ignore
-        g,  # type: ignore
-        lazy=True,
-        chunk_size=200000
-    )  # type: ignore
+    # The eager outer product rotates all vectors at once with numpy-quaternion; it peaks at the same memory as
+    # the chunked dask path (both hold the full result) but runs ~2x faster
+    poles0: Vector3d = O0.inv().outer(g)  # type: ignore
+    poles: Vector3d = (Misorientation(q) * O0).inv().outer(g)  # type: ignore
 
     w, h = plt.rcParams["figure.figsize"]
 
     plot_args = dict(resolution=1, sigma=5, log=log)
-
-    vmin, vmax = pole_plot_bounds(poles0, **plot_args)  # type: ignore
-    vmin2, vmax2 = pole_plot_bounds(poles, **plot_args)  # type: ignore
-    vmin = min(vmin, vmin2)
-    vmax = max(vmax, vmax2)
-
-    out_init = out.parent / f"{out.stem}_initial{out.suffix}"
-    out_deformed = out.parent / f"{out.stem}_deformed{out.suffix}"
-    fig1: Figure = poles0.pole_density_function(
-        **plot_args,  # type: ignore
+    figure_args = dict(
         hemisphere='both',
         colorbar=False,
-        vmin=vmin, vmax=vmax,
-        axes_labels=["X", "Y", None],  # type: ignore
+        axes_labels=["X", "Y", None],
         return_figure=True,
         figure_kwargs={"figsize": (2 * w, h)}
-    )  # type: ignore
-    fig1.suptitle("Initial")
-    fig1.tight_layout()
-    fig1.colorbar(fig1.axes[-1].collections[-1], ax=fig1.axes,
-                  label='log(MRD)' if plot_args['log'] else 'MRD')  # type: ignore
-    fig1.savefig(out_init, dpi=300)
-    print(f"Saved initial pole figure to {out_init}.")
+    )
 
-    fig2: Figure = poles.pole_density_function(
-        **plot_args,  # type: ignore
-        hemisphere='both',
-        colorbar=False,
-        vmin=vmin, vmax=vmax,
-        axes_labels=["X", "Y", None],  # type: ignore
-        return_figure=True,
-        figure_kwargs={"figsize": (2 * w, h)}
-    )  # type: ignore
-    fig2.suptitle("Deformed")
-    fig2.tight_layout()
-    fig2.colorbar(fig2.axes[-1].collections[-1], ax=fig2.axes,
-                  label='log(MRD)' if plot_args['log'] else 'MRD')  # type: ignore
-    fig2.savefig(out_deformed, dpi=300)
+    out_init = out.parent / f"{out.stem}_initial{out.suffix}"
+    out_deformed = out.parent / f"{out.stem}_deformed{out.suffix}"
+    fig1: Figure = poles0.pole_density_function(**plot_args, **figure_args)  # type: ignore
+    fig2: Figure = poles.pole_density_function(**plot_args, **figure_args)  # type: ignore
+
+    # Share one color scale across both figures, taken from the densities they already computed
+    # rather than evaluating each pole density function a second time
+    meshes = [ax.collections[-1] for fig in (fig1, fig2) for ax in fig.axes]
+    vmin = min(mesh.get_array().min() for mesh in meshes)  # type: ignore
+    vmax = max(mesh.get_array().max() for mesh in meshes)  # type: ignore
+    for mesh in meshes:
+        mesh.set_clim(vmin, vmax)
+
+    save_pole_figure(fig1, "Initial", out_init, log)
+    print(f"Saved initial pole figure to {out_init}.")
+    save_pole_figure(fig2, "Deformed", out_deformed, log)
     print(f"Saved deformed pole figure to {out_deformed}.")
-    plt.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,29 @@
+from ratel_runner.mpm.experiments.press_boundary import BoundaryType, PressBoundary, cached_options
+
+GEOMETRY = ([2.5, 5.0, 0], 2.5, 15.0, 0.4)
+
+
+def test_equal_boundaries_share_options():
+    first = PressBoundary.create(BoundaryType.CONTACT, friction_coefficient=0.3)
+    second = PressBoundary.create(BoundaryType.CONTACT, friction_coefficient=0.3)
+    assert cached_options(first, *GEOMETRY) is cached_options(second, *GEOMETRY)
+
+
+def test_unequal_boundaries_do_not_share_options():
+    contact = PressBoundary.create(BoundaryType.CONTACT, friction_coefficient=0.3)
+    frictionless = PressBoundary.create(BoundaryType.CONTACT, friction_coefficient=0.0)
+    clamped = PressBoundary.create(BoundaryType.CLAMPED)
+    slip = PressBoundary.create(BoundaryType.SLIP_FREE_ENDS)
+    options = [cached_options(boundary, *GEOMETRY) for boundary in (contact, frictionless, clamped, slip)]
+    assert len(set(options)) == len(options)
+    for boundary, expected in zip((contact, frictionless, clamped, slip), options):
+        assert expected == boundary.options(*GEOMETRY)
+
+
+def test_modified_boundary_options():
+    boundary = PressBoundary.create(BoundaryType.CONTACT, friction_coefficient=0.3)
+    before = cached_options(boundary, *GEOMETRY)
+    boundary.friction_coefficient = 0.7
+    after = cached_options(boundary, *GEOMETRY)
+    assert after != before
+    assert after == boundary.options(*GEOMETRY)
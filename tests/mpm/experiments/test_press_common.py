@@ -0,0 +1,46 @@
+import pytest
+from ratel_runner.mpm.experiments.press_common import load_uq_specification
+
+
+def write_spec(tmp_path, contents: str, encoding: str = 'utf-8'):
+    path = tmp_path / 'uq.csv'
+    path.write_text(contents, encoding=encoding)
+    return path
+
+
+def test_uq_column_types(tmp_path):
+    spec = load_uq_specification(write_spec(tmp_path, 'ints,floats,mixed,names\n1,2.5,3,a\n4,5,6.5,b\n'))
+    assert spec == {'ints': [1, 4], 'floats': [2.5, 5.0], 'mixed': [3.0, 6.5], 'names': ['a', 'b']}
+    assert all(type(value) is int for value in spec['ints'])
+    assert all(type(value) is float for value in spec['mixed'])
+
+
+def test_uq_blank_lines(tmp_path):
+    spec = load_uq_specification(write_spec(tmp_path, 'a,b\n1,2\n\n3,4\n\n'))
+    assert spec == {'a': [1, 3], 'b': [2, 4]}
+
+
+def test_uq_header_only(tmp_path):
+    assert load_uq_specification(write_spec(tmp_path, 'a,b\n')) == {'a': [], 'b': []}
+
+
+@pytest.mark.parametrize('row', ['1', '1,2,3'])
+def test_uq_ragged_row(tmp_path, row):
+    with pytest.raises(ValueError, match='line 3: expected 2 values'):
+        load_uq_specification(write_spec(tmp_path, f'a,b\n1,2\n{row}\n'))
+
+
+@pytest.mark.parametrize('row', ['1,', ',2', '1, '])
+def test_uq_empty_cell(tmp_path, row):
+    with pytest.raises(ValueError, match='line 2: missing value'):
+        load_uq_specification(write_spec(tmp_path, f'a,b\n{row}\n'))
+
+
+def test_uq_byte_order_mark(tmp_path):
+    spec = load_uq_specification(write_spec(tmp_path, 'a,b\n1,2\n', encoding='utf-8-sig'))
+    assert list(spec) == ['a', 'b']
+
+
+def test_uq_empty_file(tmp_path):
+    with pytest.raises(ValueError, match='empty'):
+        load_uq_specification(write_spec(tmp_path, ''))
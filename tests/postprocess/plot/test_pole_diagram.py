@@ -0,0 +1,85 @@
+import pytest
+
+pole_diagram = pytest.importorskip("ratel_runner.postprocess.plot.pole_diagram")
+pole_diagram.import_all()
+
+import numpy as np  # noqa: E402
+from orix.quaternion import Rotation, Misorientation  # noqa: E402
+from orix.vector import Vector3d  # noqa: E402
+
+BASIS = Vector3d(np.eye(3))
+
+
+def swarm(n0, theta0, F):
+    props = np.zeros((len(n0), 25))
+    props[:, 21:24] = n0
+    props[:, 24] = theta0
+    return {"elastic parameters": props, "model state": (F - np.eye(3)).reshape((-1, 9))}
+
+
+def reference_poles(point_data):
+    """Initial and deformation rotations computed with the inverse, determinant and axis-angle formulation"""
+    props = point_data["elastic parameters"]
+    F = point_data["model state"].reshape((-1, 3, 3)) + np.eye(3)
+    n0, theta0 = props[:, 21:24], props[:, 24]
+    z = np.zeros_like(n0)
+    z[:, 2] = 1
+    cos_theta = np.cos(theta0)
+    ab_normal0 = (cos_theta[:, None] * z + np.sin(theta0)[:, None] * np.cross(n0, z)
+                  + (np.einsum("ij,ij->i", n0, z) * (1 - cos_theta))[:, None] * n0)
+    ab_normal = np.linalg.det(F)[:, None] * np.einsum("ijk,ij->ik", np.linalg.inv(F), ab_normal0)
+    vab0, vab = Vector3d(ab_normal0), Vector3d(ab_normal)
+    axes = vab0.cross(vab)
+    axes /= axes.norm
+    return Rotation.from_axes_angles(n0, theta0), Misorientation.from_axes_angles(axes, vab0.angle_with(vab))
+
+
+def assert_same_rotations(a, b):
+    for v in BASIS:
+        np.testing.assert_allclose((a * v).data, (b * v).data, atol=1e-8)
+
+
+def random_rotations(rng, npts):
+    n0 = rng.normal(size=(npts, 3))
+    n0 /= np.linalg.norm(n0, axis=1)[:, None]
+    return n0, rng.uniform(0, np.pi, npts)
+
+
+def test_compute_poles_matches_reference():
+    rng = np.random.default_rng(0)
+    npts = 500
+    n0, theta0 = random_rotations(rng, npts)
+    F = np.eye(3) + 0.2 * rng.normal(size=(npts, 3, 3))
+    F[np.linalg.det(F) < 0, :, 0] *= -1
+    point_data = swarm(n0, theta0, F)
+    q, q0 = pole_diagram.compute_poles(point_data)
+    O0, M = reference_poles(point_data)
+    assert_same_rotations(Rotation(q0), O0)
+    assert_same_rotations(Misorientation(q), M)
+
+
+def test_compute_poles_identity_deformation():
+    rng = np.random.default_rng(1)
+    npts = 20
+    n0, theta0 = random_rotations(rng, npts)
+    # The axis-angle formulation has no rotation axis here, so compare against the identity directly
+    q, q0 = pole_diagram.compute_poles(swarm(n0, theta0, np.broadcast_to(np.eye(3), (npts, 3, 3))))
+    assert_same_rotations(Rotation(q0), Rotation.from_axes_angles(n0, theta0))
+    assert_same_rotations(Misorientation(q), Rotation.identity(npts))
+
+
+@pytest.mark.parametrize("epsilon", [1e-3, 1e-6])
+def test_compute_poles_near_antiparallel(epsilon):
+    # Rotate the z-axis normal by pi - epsilon about x, so the deformed normal is almost -z
+    npts = 4
+    angle = np.pi - epsilon
+    R = np.array([[1, 0, 0], [0, np.cos(angle), -np.sin(angle)], [0, np.sin(angle), np.cos(angle)]])
+    point_data = swarm(np.tile([0., 0., 1.], (npts, 1)), np.zeros(npts), np.broadcast_to(R, (npts, 3, 3)))
+    q, _ = pole_diagram.compute_poles(point_data)
+    assert np.all(np.isfinite(q))
+    expected = Rotation.from_axes_angles(np.tile([1., 0., 0.], (npts, 1)), np.full(npts, angle))
+    assert_same_rotations(Misorientation(q), expected)
+    if epsilon >= 1e-3:
+        # Closer to antiparallel, the reference loses the angle to arccos rounding near -1
+        _, M = reference_poles(point_data)
+        assert_same_rotations(Misorientation(q), M)